@@ -0,0 +1,98 @@
+"""Headless tests for the mesh file parsing helpers (pure NumPy, no window needed)"""
+import numpy as np
+import pytest
+
+pytest.importorskip("cv2")
+pytest.importorskip("pygame")
+pytest.importorskip("OpenGL")
+
+from video_warper import MeshWarper
+
+
+def test_parse_nodes_regular_five_columns():
+    nodes = MeshWarper._parse_nodes("0 0 0.1 0.2 1\n1 1 0.3 0.4 0.5\n")
+    assert nodes.shape == (2, 5)
+    assert nodes.dtype == np.float32
+    np.testing.assert_allclose(nodes[1], [1, 1, 0.3, 0.4, 0.5], rtol=1e-6)
+
+
+def test_parse_nodes_four_columns_default_intensity():
+    nodes = MeshWarper._parse_nodes("0 0 0.1 0.2\n1 1 0.3 0.4\n")
+    assert nodes.shape == (2, 5)
+    np.testing.assert_array_equal(nodes[:, 4], [1, 1])
+
+
+def test_parse_nodes_short_line_becomes_invalid_placeholder():
+    # 3x2 map where the fourth node is missing its intensity
+    text = ("-1 -1 0 0 1\n0 -1 0.5 0 1\n1 -1 1 0 1\n"
+            "-1 1 0 1\n0 1 0.5 1 1\n1 1 1 1 1\n")
+    nodes = MeshWarper._parse_nodes(text, max_rows=6)
+    assert nodes.shape == (6, 5)
+    assert nodes[3, 4] < 0
+    np.testing.assert_allclose(nodes[4], [0, 1, 0.5, 1, 1])
+
+
+def test_parse_nodes_comments_and_trailing_notes():
+    text = "# comment\n0 0 0.1 0.2 1\n1 1 0.3 0.4 0.5  # inline\nend of grid\n"
+    nodes = MeshWarper._parse_nodes(text, max_rows=2)
+    assert nodes.shape == (2, 5)
+    np.testing.assert_allclose(nodes[1, 4], 0.5)
+
+
+def test_parse_nodes_empty():
+    assert MeshWarper._parse_nodes("\n# only a comment\n").shape == (0, 5)
+
+
+def test_detect_mesh_dimensions():
+    s, t = np.meshgrid(np.linspace(0, 1, 4), np.linspace(0, 1, 3))
+    nodes = np.zeros((12, 5), dtype=np.float32)
+    nodes[:, 2] = s.ravel()
+    nodes[:, 3] = t.ravel()
+    assert MeshWarper._detect_mesh_dimensions(nodes) == (4, 3)
+
+
+def test_detect_mesh_dimensions_rejects_irregular_grid():
+    nodes = np.zeros((5, 5), dtype=np.float32)
+    nodes[:, 2] = [0, 0.5, 1, 0, 0.5]
+    nodes[:, 3] = [0, 0, 0, 1, 1]
+    with pytest.raises(ValueError):
+        MeshWarper._detect_mesh_dimensions(nodes)
+
+
+def _warper(rows, cols):
+    # Only the mesh state is needed; skip opening video and GL
+    warper = object.__new__(MeshWarper)
+    warper.rows, warper.cols = rows, cols
+    warper.width, warper.height = 64, 48
+    return warper
+
+
+def test_load_mesh_keeps_short_node_lines(tmp_path):
+    mesh = tmp_path / "mesh.map"
+    mesh.write_text("2\n3 2\n-1 -1 0 0 1\n0 -1 0.5 0 1\n1 -1 1 0 1\n"
+                    "-1 1 0 1\n0 1 0.5 1 1\n1 1 1 1 1\n")
+    warper = _warper(5, 4)
+    warper.load_mesh(str(mesh))
+    assert (warper.cols, warper.rows) == (3, 2)
+    assert np.count_nonzero(warper.valid) == 5
+    assert not warper.valid[3]
+
+
+def test_load_mesh_header_only_falls_back_to_requested_size(tmp_path):
+    mesh = tmp_path / "mesh.map"
+    mesh.write_text("2\n30 30\n")
+    warper = _warper(5, 4)
+    warper.load_mesh(str(mesh))
+    assert (warper.cols, warper.rows) == (4, 5)
+    assert len(warper.pos) == 20
+
+
+def test_parse_nodes_offsetting_ragged_lines_do_not_misalign():
+    # One line with an extra value and one missing a value: the totals
+    # match, but the nodes must not be shifted into each other
+    text = "0 0 0.1 0.2 1\n1 1 0.3 0.4 0.5 9\n2 2 0.5 0.6\n3 3 0.7 0.8 0.9\n"
+    nodes = MeshWarper._parse_nodes(text)
+    assert nodes.shape == (4, 5)
+    np.testing.assert_allclose(nodes[1], [1, 1, 0.3, 0.4, 0.5], rtol=1e-6)
+    assert nodes[2, 4] < 0
+    np.testing.assert_allclose(nodes[3], [3, 3, 0.7, 0.8, 0.9], rtol=1e-6)
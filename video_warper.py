@@ -2,16 +2,234 @@ import cv2
 import numpy as np
 import pygame
 from pygame.locals import *
+# PyOpenGL's per-call error and array checks cost more than the GL calls
+# themselves; they must be switched off before OpenGL.GL is imported
+import OpenGL
+OpenGL.ERROR_CHECKING = False
+OpenGL.ARRAY_SIZE_CHECKING = False
+OpenGL.STORE_POINTERS = False
 from OpenGL.GL import *
 from OpenGL.GLU import *
+from OpenGL.GL import shaders
 import sys
+import ctypes
 import tkinter as tk
 from tkinter import filedialog, ttk, messagebox
 import threading
+import time
+import multiprocessing
+import queue
 import os
 
+# Shaders for the GPU path. The vertex stage places each mesh node: with a
+# nonzero strength it applies the barrel/pincushion formula to the node's
+# input coordinates, so distorting the mesh is only a uniform update. The
+# fragment stage samples the video and applies the intensity
+WARP_VERTEX_SHADER = """
+#version 120
+uniform float strength;
+varying vec2 v_uv;
+varying vec4 v_color;
+void main() {
+    // The modelview and texture matrices scale the packed integers back
+    vec4 pos = gl_ModelViewMatrix * gl_Vertex;
+    vec2 uv = (gl_TextureMatrix[0] * gl_MultiTexCoord0).xy;
+    if (strength != 0.0) {
+        // Normalized input coordinates (-1 to 1); v is stored flipped
+        vec2 n = vec2(uv.x, 1.0 - uv.y) * 2.0 - 1.0;
+        pos.xy = n * (1.0 + strength * dot(n, n));
+    }
+    gl_Position = gl_ProjectionMatrix * pos;
+    v_uv = uv;
+    v_color = gl_Color;
+}
+"""
+
+WARP_FRAGMENT_SHADER = """
+#version 120
+uniform sampler2D tex;
+varying vec2 v_uv;
+varying vec4 v_color;
+void main() {
+    gl_FragColor = texture2D(tex, v_uv) * v_color;
+}
+"""
+
+# Vertex buffer layouts: x y, u v as 16-bit integers, plus the intensity as an
+# 8-bit grey color padded to 4 bytes (12 bytes per vertex). Meshes with a
+# uniform intensity leave the color out (8 bytes per vertex)
+VERTEX_DTYPE = np.dtype([('pos', np.int16, 2), ('uv', np.int16, 2),
+                         ('color', np.uint8, 4)])
+VERTEX_DTYPE_NO_COLOR = np.dtype([('pos', np.int16, 2), ('uv', np.int16, 2)])
+
+# Units per integer step of the packed coordinates; the modelview and texture
+# matrices scale them back. Positions cover at least ±4 (wider than common
+# screen aspects, with room for distortion) in steps that hit ±1 exactly; the
+# step doubles for meshes that reach further (see _fit_position_scale).
+# Texture coordinates cover 0 to 1
+POSITION_SCALE = 1.0 / 8192
+UV_SCALE = 1.0 / 32767
+
+# Index that ends one triangle strip and starts the next (GL 3.1+)
+PRIMITIVE_RESTART_INDEX = 0xFFFFFFFF
+
+
+def _pack_coords(values, scale):
+    """
+    Round coordinates to the nearest step of scale, as int16. Only values
+    that are never drawn (e.g. invalid nodes) should fall outside the range;
+    they are clamped
+    """
+    return np.clip(np.round(values / scale), -32767, 32767).astype(np.int16)
+
+
+try:
+    from numba import njit, prange
+    HAVE_NUMBA = True
+except ImportError:
+    HAVE_NUMBA = False
+
+
+if HAVE_NUMBA:
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _barrel_kernel(uv_norm, valid, pos, strength):
+        """Write barrel-distorted positions of the valid nodes into pos, in place"""
+        for i in prange(uv_norm.shape[0]):
+            if valid[i]:
+                u = uv_norm[i, 0]
+                v = uv_norm[i, 1]
+                factor = 1.0 + strength * (u * u + v * v)
+                pos[i, 0] = u * factor
+                pos[i, 1] = v * factor
+
+
+class VideoStream:
+    """
+    Decode frames from a cv2.VideoCapture on a background thread.
+    
+    Decoded frames are handed to the render loop through a small bounded
+    queue. For live sources the oldest frame is dropped when the queue is
+    full, so the freshest frame is always shown; for files the reader waits
+    instead. Given an fps, the reader also paces decoding at that rate, so
+    the render loop can simply show the newest frame at the display rate;
+    frames that are already overdue after a hitch are skipped without
+    being retrieved (grab() may still decode them, but they are never
+    converted or copied). At the end of a file the reader seeks back to
+    frame 0 and continues. While paused the reader stops decoding altogether.
+    """
+    
+    def __init__(self, cap, drop_frames=False, queue_size=2, fps=None):
+        self.cap = cap
+        self.drop_frames = drop_frames
+        self.frame_interval = 1.0 / fps if fps else 0.0
+        self.frames = queue.Queue(maxsize=queue_size)
+        self.running = False
+        self.thread = None
+        # Set while decoding is allowed; cleared by pause()
+        self.unpaused = threading.Event()
+        self.unpaused.set()
+    
+    def start(self):
+        """Start the reader thread"""
+        self.running = True
+        self.thread = threading.Thread(target=self._reader, daemon=True)
+        self.thread.start()
+        return self
+    
+    def _reader(self):
+        """Reader thread: decode frames until stopped or the source fails"""
+        next_time = time.perf_counter()
+        while self.running:
+            # Wake up now and then so stop() is noticed while paused
+            if not self.unpaused.wait(timeout=0.1):
+                next_time = time.perf_counter()
+                continue
+            
+            if not self._grab():
+                break
+            
+            # Wait until the grabbed frame is due
+            if self.frame_interval:
+                now = time.perf_counter()
+                if next_time > now:
+                    time.sleep(next_time - now)
+                else:
+                    # Whole frame intervals overdue: grab past those frames
+                    # without retrieving them. With the FFmpeg backend grab()
+                    # still decodes, so this saves the conversion and copy,
+                    # not the decode; it won't catch up when decoding itself
+                    # is too slow. After a long stall (over a second) just
+                    # carry on from here instead
+                    late = int((now - next_time) / self.frame_interval)
+                    if late * self.frame_interval > 1.0:
+                        next_time = now
+                    else:
+                        # Stop at the first failed grab (all() short-circuits)
+                        if not all(self._grab() for _ in range(late)):
+                            break
+                        next_time += late * self.frame_interval
+                next_time += self.frame_interval
+            
+            ret, frame = self.cap.retrieve()
+            if not ret:
+                break
+            self._put(frame)
+        self.running = False
+    
+    def _grab(self):
+        """Advance to the next frame without retrieving it, looping at the end of a file"""
+        if self.cap.grab():
+            return True
+        # Loop video
+        self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+        return self.cap.grab()
+    
+    def _put(self, frame):
+        """Queue a decoded frame, dropping the oldest one for live sources"""
+        if self.drop_frames:
+            if self.frames.full():
+                try:
+                    self.frames.get_nowait()
+                except queue.Empty:
+                    pass
+            # Only this thread adds frames, so there is room now
+            self.frames.put_nowait(frame)
+            return
+        
+        while self.running:
+            try:
+                self.frames.put(frame, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+    
+    def read(self, timeout=None):
+        """Return the next decoded frame, or None if none arrived in time"""
+        try:
+            return self.frames.get(timeout=timeout)
+        except queue.Empty:
+            return None
+    
+    def pause(self):
+        """Stop decoding until resume() is called"""
+        self.unpaused.clear()
+    
+    def resume(self):
+        """Continue decoding after pause()"""
+        self.unpaused.set()
+    
+    def stop(self):
+        """Stop the reader thread and wait for it to finish"""
+        self.running = False
+        self.unpaused.set()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+
+
 class MeshWarper:
-    def __init__(self, video_path, mesh_file=None, rows=10, cols=10):
+    def __init__(self, video_path, mesh_file=None, rows=10, cols=10,
+                 use_cpu_warp=False):
         """
         Initialize the mesh warper
         
@@ -20,21 +238,27 @@ class MeshWarper:
             mesh_file: Path to mesh warp file (optional)
             rows: Number of mesh rows (if no mesh file)
             cols: Number of mesh columns (if no mesh file)
+            use_cpu_warp: Warp frames on the CPU with cv2.remap and draw
+                          them unwarped (no shaders needed)
         """
         self.rows = rows
         self.cols = cols
         self.video_path = video_path
         self.mesh_file = mesh_file
+        self.use_cpu_warp = use_cpu_warp
         
         # Open video source
         if isinstance(video_path, int):
             self.cap = cv2.VideoCapture(video_path)
         else:
-            self.cap = cv2.VideoCapture(video_path)
+            self.cap = self._open_video_file(video_path)
         
         if not self.cap.isOpened():
             raise ValueError("Could not open video source")
         
+        # Background decoder (started by run)
+        self.stream = None
+        
         # Get video properties
         self.width = int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH))
         self.height = int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
@@ -44,19 +268,89 @@ class MeshWarper:
         self.window_width = 800
         self.window_height = 600
         self.fullscreen = False
+        self.vsync = False
         
         # Initialize mesh
         if mesh_file:
-            self.mesh = self.load_mesh(mesh_file)
+            self.load_mesh(mesh_file)
         else:
-            self.mesh = self.create_identity_mesh()
+            self.create_identity_mesh()
         
         # Texture ID
         self.texture_id = None
         
+        # Mesh vertex and index buffers, and the vertex array object that
+        # records their layout
+        self.vao = None
+        self.vbo = None
+        self.ebo = None
+        self.vertices = None
+        self.index_count = 0
+        # Step of the packed vertex positions (see POSITION_SCALE)
+        self.position_scale = POSITION_SCALE
+        # Mesh rows are drawn as triangle strips joined by primitive restart
+        # where supported, otherwise as a plain triangle list
+        self._primitive_restart = False
+        self.draw_mode = GL_TRIANGLES
+        
+        # Pixel buffers for streaming frames into the texture
+        self.pbos = None
+        self.pbo_index = 0
+        # Whether pbos[pbo_index] holds a frame not yet copied to the texture
+        self._pbo_pending = False
+        self.frame_nbytes = self.width * self.height * 3
+        
+        # Shader program and the radial warp strength it applies
+        self.program = None
+        self.warp_strength = 0.0
+        self.warp_strength_location = -1
+        
+        # Lookup maps for the CPU warp path (built from the mesh)
+        self._mapx = None
+        self._mapy = None
+        self._intensity_map = None
+        # Reused output frame for the CPU warp, to avoid an allocation per frame
+        self._warp_buf = (np.empty((self.height, self.width, 3), dtype=np.uint8)
+                          if use_cpu_warp else None)
+        # Run the CPU warp through OpenCL (cv2.UMat) when a device is available,
+        # into a reused device-side frame
+        self._use_umat = use_cpu_warp and cv2.ocl.haveOpenCL()
+        self._warp_umat = None
+        if self._use_umat:
+            cv2.ocl.setUseOpenCL(True)
+            self._warp_umat = cv2.UMat(self.height, self.width, cv2.CV_8UC3)
+        # Reused buffer for frames that don't match the reported video size
+        # (allocated the first time one arrives)
+        self._resize_buf = None
+        
         # Initialize pygame and OpenGL
         self.init_gl()
         
+        # Without shaders the mesh is distorted on the CPU; compile the
+        # kernel now rather than on the first keypress
+        if HAVE_NUMBA and self.program is None:
+            _barrel_kernel(self.uv_norm, self.valid, self.pos.copy(), 0.0)
+        
+    @staticmethod
+    def _open_video_file(video_path):
+        """
+        Open a video file, asking FFmpeg for hardware decoding where this
+        OpenCV build supports it (OpenCV 4.5.2+), otherwise opening it as usual
+        """
+        if hasattr(cv2, 'VIDEO_ACCELERATION_ANY'):
+            try:
+                cap = cv2.VideoCapture(video_path, cv2.CAP_FFMPEG,
+                                       [cv2.CAP_PROP_HW_ACCELERATION,
+                                        cv2.VIDEO_ACCELERATION_ANY])
+                if cap.isOpened():
+                    if cap.get(cv2.CAP_PROP_HW_ACCELERATION) > 0:
+                        print("Using hardware video decoding")
+                    return cap
+                cap.release()
+            except Exception as e:
+                print(f"Hardware decoding unavailable: {e}")
+        return cv2.VideoCapture(video_path)
+    
     def load_mesh(self, mesh_file):
         """
         Load mesh from file according to the warping map format:
@@ -73,125 +367,230 @@ class MeshWarper:
                 These map to pixels in the source video
         - intensity: multiplicative factor (0 to 1 range)
         - Values outside valid ranges indicate nodes should not be used
+        
+        Files with only node lines (no header) are also accepted; nx and ny
+        are then inferred from the distinct u and v values.
         """
-        mesh = []
         try:
             with open(mesh_file, 'r') as f:
-                lines = [l.strip() for l in f.readlines() if l.strip() and not l.strip().startswith('#')]
-                
-                if len(lines) < 3:
-                    raise ValueError("Mesh file too short")
-                
-                # Line 1: Should be 2
-                format_version = int(lines[0])
-                if format_version != 2:
-                    print(f"Warning: Expected format version 2, got {format_version}")
+                # Header: the first two non-empty, non-comment lines
+                header = []
+                for line in f:
+                    line = line.strip()
+                    if line and not line.startswith('#'):
+                        header.append(line)
+                        if len(header) == 2 or len(line.split()) >= 4:
+                            break
                 
-                # Line 2: nx ny (columns rows)
-                dimensions = lines[1].split()
-                if len(dimensions) != 2:
-                    raise ValueError("Invalid mesh dimensions line")
-                
-                nx, ny = map(int, dimensions)
-                self.cols = nx
-                self.rows = ny
-                
-                print(f"Loading mesh: {nx}x{ny} ({nx*ny} nodes)")
-                
-                # Lines 3+: node data
-                expected_nodes = nx * ny
-                node_lines = lines[2:]
-                
-                if len(node_lines) < expected_nodes:
-                    print(f"Warning: Expected {expected_nodes} nodes, found {len(node_lines)}")
-                
-                for i, line in enumerate(node_lines[:expected_nodes]):
-                    parts = line.split()
-                    if len(parts) >= 5:
-                        x, y, u, v, intensity = map(float, parts[:5])
-                        
-                        # Check if node is valid according to the specification
-                        valid = True
-                        
-                        # u, v outside 0-1 range means node should not be used
-                        if u < 0 or u > 1 or v < 0 or v > 1:
-                            valid = False
-                        
-                        # Negative intensity means node should not be drawn
-                        if intensity < 0:
-                            valid = False
-                        
-                        # Intensity outside 0-1 range should not be used
-                        if intensity > 1:
-                            valid = False
-                        
-                        mesh.append({
-                            'x': x,
-                            'y': y,
-                            'u': u,
-                            'v': v,
-                            'i': intensity,
-                            'valid': valid
-                        })
-                    else:
-                        print(f"Warning: Invalid node data at line {i+3}")
-                        # Add invalid node as placeholder
-                        mesh.append({
-                            'x': 0, 'y': 0, 'u': 0, 'v': 0, 'i': 0, 'valid': False
-                        })
-                
-                print(f"Loaded {len(mesh)} nodes from mesh file")
-                valid_count = sum(1 for n in mesh if n['valid'])
-                print(f"Valid nodes: {valid_count}/{len(mesh)}")
-                
-                return mesh
+                if header and len(header[0].split()) >= 4:
+                    # No header: the file is node data only
+                    nodes = self._parse_nodes(header[0] + '\n' + f.read())
+                    nx, ny = self._detect_mesh_dimensions(nodes)
+                else:
+                    if len(header) < 2:
+                        raise ValueError("Mesh file too short")
+                    
+                    # Line 1: Should be 2
+                    format_version = int(header[0])
+                    if format_version != 2:
+                        print(f"Warning: Expected format version 2, got {format_version}")
+                    
+                    # Line 2: nx ny (columns rows)
+                    dimensions = header[1].split()
+                    if len(dimensions) != 2:
+                        raise ValueError("Invalid mesh dimensions line")
+                    
+                    nx, ny = map(int, dimensions)
+                    
+                    # Lines 3+: node data, parsed in a single call
+                    nodes = self._parse_nodes(f.read(), max_rows=nx * ny)
+            
+            if len(nodes) == 0:
+                raise ValueError("Mesh file too short")
+            
+            # Only adopt the file's dimensions once it has node data, so a
+            # failed load falls back to an identity mesh of the requested size
+            self.cols = nx
+            self.rows = ny
+            print(f"Loading mesh: {nx}x{ny} ({nx*ny} nodes)")
+            
+            expected_nodes = nx * ny
+            if len(nodes) < expected_nodes:
+                print(f"Warning: Expected {expected_nodes} nodes, found {len(nodes)}")
+            nodes = nodes[:expected_nodes]
+            loaded_count = len(nodes)
+            
+            u = nodes[:, 2]
+            v = nodes[:, 3]
+            intensity = nodes[:, 4]
+            
+            # Check if nodes are valid according to the specification:
+            # u, v outside 0-1 range means node should not be used,
+            # intensity outside 0-1 range (or negative) should not be drawn
+            valid = ((u >= 0) & (u <= 1) & (v >= 0) & (v <= 1) &
+                     (intensity >= 0) & (intensity <= 1))
+            
+            # Pad missing nodes with invalid placeholders
+            if loaded_count < expected_nodes:
+                missing = expected_nodes - loaded_count
+                nodes = np.vstack([nodes, np.zeros((missing, 5), dtype=np.float32)])
+                valid = np.concatenate([valid, np.zeros(missing, dtype=bool)])
+            
+            self._set_mesh(nodes[:, 0:2], nodes[:, 2:4], nodes[:, 4], valid)
+            
+            print(f"Loaded {loaded_count} nodes from mesh file")
+            print(f"Valid nodes: {np.count_nonzero(valid)}/{loaded_count}")
                     
         except FileNotFoundError:
             print(f"Mesh file {mesh_file} not found, using identity mesh")
-            return self.create_identity_mesh()
+            self.create_identity_mesh()
         except Exception as e:
             print(f"Error loading mesh: {e}, using identity mesh")
             import traceback
             traceback.print_exc()
-            return self.create_identity_mesh()
+            self.create_identity_mesh()
+    
+    @staticmethod
+    def _parse_nodes(text, max_rows=None):
+        """
+        Parse node lines (x y u v [intensity]) into an (N, 5) float32 array.
+        If the first node line has only 4 values, intensity defaults to 1.
+        A line with fewer values than that becomes an invalid placeholder
+        node (intensity -1). With max_rows, anything after that many nodes
+        (e.g. trailing notes) is ignored.
+        """
+        node_lines = [l for l in text.splitlines()
+                      if l.strip() and not l.lstrip().startswith('#')]
+        if not node_lines:
+            return np.empty((0, 5), dtype=np.float32)
+        ncols = len(node_lines[0].split())
+        if ncols < 4:
+            raise ValueError("Invalid node data: expected x y u v [intensity]")
+        
+        nodes = None
+        short = None
+        if '#' not in text:
+            # Fast path: one C-level scan of all whitespace-separated values,
+            # usable when every line holds the same number of them
+            try:
+                values = np.fromstring(text, dtype=np.float32, sep=' ')
+                # Matching totals can still hide a long line offset by a short
+                # one, so confirm the per-line counts before reshaping
+                if (values.size == len(node_lines) * ncols and
+                        all(len(l.split()) == ncols for l in node_lines)):
+                    nodes = values.reshape(-1, ncols)
+            except ValueError:
+                pass
+        if nodes is None:
+            # Comments or irregular lines: parse line by line
+            if max_rows is not None:
+                node_lines = node_lines[:max_rows]
+            needed = min(ncols, 5)
+            nodes = np.zeros((len(node_lines), needed), dtype=np.float32)
+            short = np.zeros(len(node_lines), dtype=bool)
+            for i, line in enumerate(node_lines):
+                parts = line.split('#', 1)[0].split()
+                if len(parts) >= needed:
+                    nodes[i] = [float(p) for p in parts[:needed]]
+                else:
+                    short[i] = True
+            if short.any():
+                print(f"Warning: {np.count_nonzero(short)} node lines have too few "
+                      f"values, using invalid placeholder nodes")
+        
+        if ncols == 4:
+            nodes = np.hstack([nodes, np.ones((len(nodes), 1), dtype=np.float32)])
+        else:
+            nodes = np.ascontiguousarray(nodes[:, :5])
+        if short is not None:
+            nodes[short] = (0.0, 0.0, 0.0, 0.0, -1.0)
+        return nodes
+    
+    @staticmethod
+    def _detect_mesh_dimensions(nodes):
+        """
+        Infer (nx, ny) for a headerless node list from the number of distinct
+        u and v values; only a complete regular grid can be detected
+        """
+        ucount = np.unique(nodes[:, 2]).size
+        vcount = np.unique(nodes[:, 3]).size
+        if ucount * vcount != len(nodes):
+            raise ValueError("Mesh file has no dimensions line and the nodes "
+                             "do not form a regular grid")
+        return ucount, vcount
     
     def create_identity_mesh(self):
         """
         Create an identity mesh (no warping)
         Maps input texture directly to output with correct aspect ratio
         """
-        mesh = []
-        
         # Calculate aspect ratio of the video
         aspect_ratio = self.width / self.height if self.height > 0 else 16/9
         
-        for r in range(self.rows):
-            for c in range(self.cols):
-                # Output coordinates: x uses ±aspect_ratio, y uses ±1
-                x = (c / (self.cols - 1)) * 2.0 * aspect_ratio - aspect_ratio
-                y = (r / (self.rows - 1)) * 2.0 - 1.0
-                
-                # Input texture coordinates: u, v both in [0, 1]
-                u = c / (self.cols - 1)  # 0 to 1
-                v = 1.0 - (r / (self.rows - 1))  # 0 to 1 (flipped for OpenGL texture coords)
-                
-                mesh.append({
-                    'x': x,      # Output screen coordinate
-                    'y': y,      # Output screen coordinate
-                    'u': u,      # Input texture coordinate
-                    'v': v,      # Input texture coordinate
-                    'i': 1.0,
-                    'valid': True
-                })
-        return mesh
+        # Grid parameters (0 to 1): s along a row (columns), t down the rows
+        s = np.linspace(0.0, 1.0, self.cols, dtype=np.float32)[None, :]
+        t = np.linspace(0.0, 1.0, self.rows, dtype=np.float32)[:, None]
+        
+        # Fill (rows, cols, 2) grids by broadcasting the row and column values;
+        # reshaping them gives the row-major node order
+        pos = np.empty((self.rows, self.cols, 2), dtype=np.float32)
+        uv = np.empty((self.rows, self.cols, 2), dtype=np.float32)
+        
+        # Output coordinates: x uses ±aspect_ratio, y uses ±1
+        pos[..., 0] = s * 2.0 * aspect_ratio - aspect_ratio
+        pos[..., 1] = t * 2.0 - 1.0
+        
+        # Input texture coordinates: u, v both in [0, 1]
+        uv[..., 0] = s
+        uv[..., 1] = 1.0 - t  # flipped for OpenGL texture coords
+        
+        node_count = self.rows * self.cols
+        self._set_mesh(pos.reshape(-1, 2), uv.reshape(-1, 2),
+                       np.ones(node_count, dtype=np.float32),
+                       np.ones(node_count, dtype=bool))
+    
+    def _set_mesh(self, pos, uv, intensity, valid):
+        """
+        Store the mesh as parallel arrays, one entry per node (row-major):
+        pos (N, 2) output x, y; uv (N, 2) input u, v;
+        intensity (N,); valid (N,) bool
+        """
+        self.pos = np.ascontiguousarray(pos, dtype=np.float32)
+        self.uv = np.ascontiguousarray(uv, dtype=np.float32)
+        self.intensity = np.ascontiguousarray(intensity, dtype=np.float32)
+        self.valid = np.ascontiguousarray(valid, dtype=bool)
+        
+        # Normalized texture coordinates (-1 to 1) used by the distortion effects,
+        # computed once per mesh. Both arrays are frozen so the cache can only
+        # change together with the mesh, through this method
+        self.uv_norm = self.uv * 2.0 - 1.0
+        self.uv.flags.writeable = False
+        self.uv_norm.flags.writeable = False
+        
+        # Meshes whose drawn nodes all share one intensity need no per-vertex
+        # color; that intensity is set once as the current color instead
+        drawn = np.clip(self.intensity[self.valid], 0.0, 1.0)
+        self._intensity_uniform = bool(drawn.size == 0 or np.all(drawn == drawn[0]))
+        self._intensity_value = float(drawn[0]) if drawn.size else 1.0
+        
+        # A quad (mesh cell) is drawn only if all four corner nodes are valid;
+        # quad_valid[r, c] covers the cell between rows r, r+1 and columns c, c+1
+        grid_valid = self.valid.reshape(self.rows, self.cols)
+        self.quad_valid = (grid_valid[:-1, :-1] & grid_valid[:-1, 1:] &
+                           grid_valid[1:, :-1] & grid_valid[1:, 1:])
+        
+        # Triangle indices only depend on the mesh layout and validity, so they
+        # are built once here and shared by the GPU upload and the CPU warp
+        self.indices = self.build_indices()
+        self.strip_indices = self.build_strip_indices()
     
     def init_gl(self):
         """Initialize OpenGL context"""
         pygame.init()
         
-        # Create resizable window
+        # Create resizable window, synced to the display refresh if possible
         display = (self.window_width, self.window_height)
-        pygame.display.set_mode(display, DOUBLEBUF | OPENGL | RESIZABLE)
+        self._set_display_mode(display, DOUBLEBUF | OPENGL | RESIZABLE)
         pygame.display.set_caption("Real-time Mesh Warping - Press F11 for Fullscreen")
         
         # Set up orthographic projection
@@ -200,15 +599,311 @@ class MeshWarper:
         # Enable texturing
         glEnable(GL_TEXTURE_2D)
         
-        # Enable blending for intensity control
-        glEnable(GL_BLEND)
-        glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
+        # Intensity is applied through the vertex color; nothing is blended,
+        # depth tested or dithered
+        glDisable(GL_BLEND)
+        glDisable(GL_DEPTH_TEST)
+        glDisable(GL_DITHER)
+        
+        # The whole mesh goes out as one draw of triangle strips separated
+        # by restart indices, where the GL version has primitive restart
+        self._primitive_restart = self._gl_version() >= (3, 1)
+        if self._primitive_restart:
+            glEnable(GL_PRIMITIVE_RESTART)
+            glPrimitiveRestartIndex(PRIMITIVE_RESTART_INDEX)
         
         # Create texture
         self.texture_id = glGenTextures(1)
         glBindTexture(GL_TEXTURE_2D, self.texture_id)
         glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_LINEAR)
         glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_LINEAR)
+        
+        # Warped lookups that fall outside the frame come out black
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_S, GL_CLAMP_TO_BORDER)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_T, GL_CLAMP_TO_BORDER)
+        glTexParameterfv(GL_TEXTURE_2D, GL_TEXTURE_BORDER_COLOR, (0.0, 0.0, 0.0, 1.0))
+        
+        # Frames are uploaded as decoded: tightly packed rows of self.width pixels,
+        # top row first (the flip lives in the texture coordinates). 3-byte
+        # pixels leave rows unaligned, so no row padding is assumed either
+        glPixelStorei(GL_UNPACK_ALIGNMENT, 1)
+        glPixelStorei(GL_UNPACK_ROW_LENGTH, self.width)
+        
+        # Allocate texture storage once; frames are streamed in with glTexSubImage2D
+        glTexImage2D(GL_TEXTURE_2D, 0, GL_RGB, self.width, self.height,
+                     0, GL_BGR, GL_UNSIGNED_BYTE, None)
+        
+        # Two pixel buffers used alternately, so a frame can be copied into
+        # one while the driver is still uploading the previous frame from the other
+        self.pbos = glGenBuffers(2)
+        for pbo in self.pbos:
+            glBindBuffer(GL_PIXEL_UNPACK_BUFFER, pbo)
+            glBufferData(GL_PIXEL_UNPACK_BUFFER, self.frame_nbytes, None, GL_STREAM_DRAW)
+        glBindBuffer(GL_PIXEL_UNPACK_BUFFER, 0)
+        
+        # Create mesh buffers and upload the initial mesh. Where vertex array
+        # objects exist (GL 3.0+), one records the buffers and pointers so
+        # drawing only has to bind it
+        if glGenVertexArrays:
+            self.vao = glGenVertexArrays(1)
+            glBindVertexArray(self.vao)
+        self.vbo = glGenBuffers(1)
+        self.ebo = glGenBuffers(1)
+        glEnableClientState(GL_VERTEX_ARRAY)
+        glEnableClientState(GL_TEXTURE_COORD_ARRAY)
+        self.upload_mesh()
+        
+        if not self.use_cpu_warp:
+            self.init_shaders()
+    
+    @staticmethod
+    def _gl_version():
+        """(major, minor) version of the current GL context, (0, 0) if unknown"""
+        try:
+            version = glGetString(GL_VERSION).split()[0]
+            return tuple(int(n) for n in version.split(b'.')[:2])
+        except Exception:
+            return (0, 0)
+    
+    def _set_display_mode(self, size, flags):
+        """
+        Set the display mode with vsync, or without it where it is not
+        supported, and record which one we got
+        """
+        try:
+            pygame.display.set_mode(size, flags, vsync=1)
+        except (TypeError, pygame.error):
+            pygame.display.set_mode(size, flags)
+        # Swap interval 1, or -1 for adaptive vsync
+        self.vsync = pygame.display.gl_get_attribute(pygame.GL_SWAP_CONTROL) != 0
+    
+    def init_shaders(self):
+        """Compile the warp shader program, or fall back to fixed-function GL"""
+        try:
+            self.program = shaders.compileProgram(
+                shaders.compileShader(WARP_VERTEX_SHADER, GL_VERTEX_SHADER),
+                shaders.compileShader(WARP_FRAGMENT_SHADER, GL_FRAGMENT_SHADER))
+        except Exception as e:
+            print(f"Could not set up shaders: {e}, distorting the mesh on the CPU")
+            self.program = None
+            return
+        
+        glUseProgram(self.program)
+        glUniform1i(glGetUniformLocation(self.program, "tex"), 0)
+        self.warp_strength_location = glGetUniformLocation(self.program, "strength")
+        self.set_warp_strength(self.warp_strength)
+    
+    def set_warp_strength(self, strength):
+        """Set the barrel/pincushion strength applied by the vertex shader"""
+        self.warp_strength = strength
+        if self.program is not None:
+            glUniform1f(self.warp_strength_location, strength)
+    
+    def upload_mesh(self):
+        """
+        Upload the whole mesh (vertices and indices) to the GPU.
+        On the CPU warp path, frames arrive already warped, so the GPU
+        only gets a single quad covering the video area.
+        """
+        self.draw_mode = GL_TRIANGLES
+        if self.use_cpu_warp:
+            self._update_remap()
+            vertices, indices = self._video_quad()
+        elif self._primitive_restart:
+            vertices, indices = self._mesh_vertices(), self.strip_indices
+            self.draw_mode = GL_TRIANGLE_STRIP
+        else:
+            vertices, indices = self._mesh_vertices(), self.indices
+        self.vertices = vertices
+        dtype = vertices.dtype
+        
+        glBindBuffer(GL_ARRAY_BUFFER, self.vbo)
+        glBufferData(GL_ARRAY_BUFFER, vertices.nbytes, vertices.view(np.uint8),
+                     GL_DYNAMIC_DRAW)
+        
+        stride = dtype.itemsize
+        glVertexPointer(2, GL_SHORT, stride, ctypes.c_void_p(dtype.fields['pos'][1]))
+        glTexCoordPointer(2, GL_SHORT, stride, ctypes.c_void_p(dtype.fields['uv'][1]))
+        if 'color' in dtype.fields:
+            glEnableClientState(GL_COLOR_ARRAY)
+            glColorPointer(3, GL_UNSIGNED_BYTE, stride,
+                           ctypes.c_void_p(dtype.fields['color'][1]))
+        else:
+            glDisableClientState(GL_COLOR_ARRAY)
+            c = self._intensity_value if self._intensity_uniform else 1.0
+            glColor3f(c, c, c)
+        
+        self.index_count = len(indices)
+        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, self.ebo)
+        glBufferData(GL_ELEMENT_ARRAY_BUFFER, indices.nbytes, indices, GL_STATIC_DRAW)
+    
+    def _mesh_vertices(self):
+        """Interleave the mesh arrays into the vertex buffer layout (see VERTEX_DTYPE)"""
+        dtype = VERTEX_DTYPE_NO_COLOR if self._intensity_uniform else VERTEX_DTYPE
+        vertices = np.empty(len(self.pos), dtype=dtype)
+        self._fit_position_scale(self.pos[self.valid])
+        vertices['pos'] = _pack_coords(self.pos, self.position_scale)
+        # Frames are uploaded top row first, so flip v here rather than
+        # flipping every frame on the CPU
+        uv = self.uv.copy()
+        uv[:, 1] = 1.0 - uv[:, 1]
+        vertices['uv'] = _pack_coords(uv, UV_SCALE)
+        if not self._intensity_uniform:
+            # Intensity as a grey color (multiplicative factor for r,g,b)
+            shade = np.round(np.clip(self.intensity, 0.0, 1.0) * 255).astype(np.uint8)
+            vertices['color'][:, 0:3] = shade[:, None]
+            vertices['color'][:, 3] = 255
+        return vertices
+    
+    def _video_quad(self):
+        """Vertices and indices of a plain quad over the video area (x: ±aspect_ratio, y: ±1)"""
+        aspect_ratio = self.width / self.height if self.height > 0 else 16/9
+        vertices = np.empty(4, dtype=VERTEX_DTYPE_NO_COLOR)
+        corners = np.array([(-aspect_ratio, -1.0), (aspect_ratio, -1.0),
+                            (aspect_ratio, 1.0), (-aspect_ratio, 1.0)])
+        self._fit_position_scale(corners)
+        vertices['pos'] = _pack_coords(corners, self.position_scale)
+        # Top row of the (already warped) frame at the top of the screen
+        vertices['uv'] = _pack_coords(np.array([(0.0, 1.0), (1.0, 1.0), (1.0, 0.0), (0.0, 0.0)]),
+                                      UV_SCALE)
+        indices = np.array([0, 1, 2, 2, 3, 0], dtype=np.uint32)
+        return vertices, indices
+    
+    def _fit_position_scale(self, positions):
+        """
+        Choose the packed position step so all of positions fit in int16: the
+        default step, doubled as often as needed (±1 stays exact). Updates the
+        modelview scale and returns True if the step changed.
+        """
+        positions = positions[np.isfinite(positions)]
+        extent = float(np.abs(positions).max()) if positions.size else 0.0
+        scale = POSITION_SCALE
+        while extent > 32767 * scale:
+            scale *= 2.0
+        if scale == self.position_scale:
+            return False
+        if scale != POSITION_SCALE:
+            print(f"Mesh positions reach ±{extent:.2f}, packing them in steps of {scale:g}")
+        self.position_scale = scale
+        self._load_position_scale()
+        return True
+    
+    def _load_position_scale(self):
+        """Scale the packed vertex positions back to mesh units (modelview matrix)"""
+        glMatrixMode(GL_MODELVIEW)
+        glLoadIdentity()
+        glScalef(self.position_scale, self.position_scale, 1.0)
+    
+    def update_mesh_positions(self):
+        """Copy the mesh positions into the vertex buffer after they changed"""
+        if self.use_cpu_warp:
+            # The GPU only draws the video quad; the warp lives in the remap maps
+            self._update_remap()
+            return
+        
+        # Positions that outgrew the packed range need a new scale, and so
+        # a full re-upload
+        if self._fit_position_scale(self.pos[self.valid]):
+            self.upload_mesh()
+            return
+        
+        self.vertices['pos'] = _pack_coords(self.pos, self.position_scale)
+        glBindBuffer(GL_ARRAY_BUFFER, self.vbo)
+        
+        # Write the positions straight into the mapped buffer. The texture
+        # coordinates and colors share the range, so it is not invalidated
+        ptr = None
+        if glMapBufferRange:
+            ptr = glMapBufferRange(GL_ARRAY_BUFFER, 0, self.vertices.nbytes,
+                                   GL_MAP_WRITE_BIT)
+        if ptr:
+            address = ctypes.cast(ptr, ctypes.c_void_p).value
+            mapped = np.frombuffer((ctypes.c_ubyte * self.vertices.nbytes).from_address(address),
+                                   dtype=self.vertices.dtype)
+            mapped['pos'] = self.vertices['pos']
+            glUnmapBuffer(GL_ARRAY_BUFFER)
+        else:
+            glBufferSubData(GL_ARRAY_BUFFER, 0, self.vertices.nbytes,
+                            self.vertices.view(np.uint8))
+    
+    def _update_remap(self):
+        """Rebuild the CPU warp lookup maps from the current mesh"""
+        self._mapx, self._mapy, self._intensity_map = self._build_remap_from_mesh()
+        
+        # Keep the maps on the OpenCL device so only frames move per update
+        if self._use_umat:
+            self._mapx = cv2.UMat(self._mapx)
+            self._mapy = cv2.UMat(self._mapy)
+            if self._intensity_map is not None:
+                self._intensity_map = cv2.UMat(self._intensity_map)
+    
+    def _build_remap_from_mesh(self):
+        """
+        Rasterize the mesh into full-resolution cv2.remap lookup maps.
+        
+        The output frame covers the video area (x: ±aspect_ratio, y: ±1).
+        For every output pixel, map_x/map_y hold the source pixel to sample,
+        interpolated across the mesh triangles; pixels not covered by a valid
+        quad keep -1 and come out black. Also returns the per-pixel intensity
+        as a 3-channel map, or None if it is uniform (the video quad's color
+        applies it then).
+        """
+        w, h = self.width, self.height
+        aspect_ratio = w / h if h > 0 else 16/9
+        
+        # Node positions in output pixels, texture coordinates in source pixels
+        # (row 0 is the top of the frame, hence the flipped y and v), in
+        # float64 so the per-triangle coefficients below stay exact
+        pos = self.pos.astype(np.float64)
+        uv = self.uv.astype(np.float64)
+        px = (pos[:, 0] + aspect_ratio) / (2.0 * aspect_ratio) * w - 0.5
+        py = (1.0 - pos[:, 1]) / 2.0 * h - 0.5
+        sx = uv[:, 0] * w - 0.5
+        sy = (1.0 - uv[:, 1]) * h - 0.5
+        
+        # Label every output pixel with the triangle covering it (one C call
+        # per triangle, with 4 bits of sub-pixel precision); -1 is uncovered
+        tris = self.indices.reshape(-1, 3)
+        ta, tb, tc = tris[:, 0], tris[:, 1], tris[:, 2]
+        det = (py[tb] - py[tc]) * (px[ta] - px[tc]) + (px[tc] - px[tb]) * (py[ta] - py[tc])
+        corners = np.stack([px[tris], py[tris]], axis=-1)
+        corners = np.round(np.clip(corners, -2**20, 2**20) * 16).astype(np.int32)
+        labels = np.full((h, w), -1, dtype=np.int32)
+        for k in np.flatnonzero(det != 0):
+            cv2.fillConvexPoly(labels, corners[k], int(k), cv2.LINE_8, 4)
+        
+        # Within a triangle every mapped value is an affine function of the
+        # pixel position, f = ax * x + ay * y + c. Work out the coefficients
+        # per triangle, then evaluate them for all pixels through the labels
+        # (row 0 of each table is for uncovered pixels)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            p0x = (py[tb] - py[tc]) / det
+            p0y = (px[tc] - px[tb]) / det
+            p1x = (py[tc] - py[ta]) / det
+            p1y = (px[ta] - px[tc]) / det
+        p0c = -(p0x * px[tc] + p0y * py[tc])
+        p1c = -(p1x * px[tc] + p1y * py[tc])
+        
+        index = labels + 1
+        gx = np.arange(w, dtype=np.float32)[None, :]
+        gy = np.arange(h, dtype=np.float32)[:, None]
+        
+        def interpolate(f, outside):
+            da = f[ta] - f[tc]
+            db = f[tb] - f[tc]
+            tables = [np.concatenate(([0.0], p0x * da + p1x * db)),
+                      np.concatenate(([0.0], p0y * da + p1y * db)),
+                      np.concatenate(([outside], f[tc] + p0c * da + p1c * db))]
+            ax, ay, c = (np.take(t.astype(np.float32), index) for t in tables)
+            return ax * gx + ay * gy + c
+        
+        map_x = interpolate(sx, -1.0)
+        map_y = interpolate(sy, -1.0)
+        
+        if self._intensity_uniform:
+            return map_x, map_y, None
+        shade = interpolate(self.intensity, 0.0)
+        return map_x, map_y, cv2.merge([shade, shade, shade])
     
     def setup_viewport(self, width, height):
         """Setup viewport and projection for given window size"""
@@ -222,7 +917,12 @@ class MeshWarper:
         # Set orthographic projection to match aspect ratio
         # This allows x coordinates to use ±aspect_ratio range
         glOrtho(-window_aspect, window_aspect, -1, 1, -1, 1)
-        glMatrixMode(GL_MODELVIEW)
+        
+        # The vertex buffer holds coordinates as 16-bit integers; scale them back
+        glMatrixMode(GL_TEXTURE)
+        glLoadIdentity()
+        glScalef(UV_SCALE, UV_SCALE, 1.0)
+        self._load_position_scale()
         
     def toggle_fullscreen(self):
         """Toggle fullscreen mode"""
@@ -232,13 +932,13 @@ class MeshWarper:
             # Get display info for fullscreen resolution
             info = pygame.display.Info()
             display = (info.current_w, info.current_h)
-            pygame.display.set_mode(display, DOUBLEBUF | OPENGL | FULLSCREEN)
+            self._set_display_mode(display, DOUBLEBUF | OPENGL | FULLSCREEN)
             self.window_width = info.current_w
             self.window_height = info.current_h
         else:
             # Return to windowed mode
             display = (800, 600)
-            pygame.display.set_mode(display, DOUBLEBUF | OPENGL | RESIZABLE)
+            self._set_display_mode(display, DOUBLEBUF | OPENGL | RESIZABLE)
             self.window_width = 800
             self.window_height = 600
         
@@ -252,107 +952,149 @@ class MeshWarper:
         
     def update_texture(self, frame):
         """Update OpenGL texture with new frame"""
-        # Convert BGR to RGB
-        frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        # The pixel buffers are sized for the reported video dimensions; a
+        # frame of the same byte count but another shape (e.g. rotated) must
+        # be resized too, or it would not fit the mapped buffer
+        if frame.shape[:2] != (self.height, self.width):
+            if self._resize_buf is None:
+                self._resize_buf = np.empty((self.height, self.width, 3), dtype=np.uint8)
+            frame = cv2.resize(frame, (self.width, self.height), dst=self._resize_buf)
         
-        # Flip vertically for OpenGL
-        frame_rgb = cv2.flip(frame_rgb, 0)
+        # Ping-pong: the texture is updated from the pixel buffer filled on the
+        # previous call, so that transfer overlaps with copying this frame
+        # into the other buffer (the texture runs one video frame behind
+        # until flush_texture catches it up)
+        self.flush_texture()
         
+        # Write the BGR frame straight into the other pixel buffer; GL does the
+        # channel swap and the vertical flip is folded into the mesh texture coordinates
+        glBindBuffer(GL_PIXEL_UNPACK_BUFFER, self.pbos[self.pbo_index ^ 1])
+        ptr = glMapBufferRange(GL_PIXEL_UNPACK_BUFFER, 0, self.frame_nbytes,
+                               GL_MAP_WRITE_BIT | GL_MAP_INVALIDATE_BUFFER_BIT)
+        if ptr:
+            address = ctypes.cast(ptr, ctypes.c_void_p).value
+            mapped = np.frombuffer((ctypes.c_ubyte * self.frame_nbytes).from_address(address),
+                                   dtype=np.uint8).reshape(self.height, self.width, 3)
+            self._write_frame(frame, mapped)
+            glUnmapBuffer(GL_PIXEL_UNPACK_BUFFER)
+            self._pbo_pending = True
+        
+        glBindBuffer(GL_PIXEL_UNPACK_BUFFER, 0)
+        self.pbo_index ^= 1
+    
+    def flush_texture(self):
+        """Copy the frame waiting in the pixel buffer (if any) into the texture"""
+        if not self._pbo_pending:
+            return
+        glBindBuffer(GL_PIXEL_UNPACK_BUFFER, self.pbos[self.pbo_index])
         glBindTexture(GL_TEXTURE_2D, self.texture_id)
-        glTexImage2D(GL_TEXTURE_2D, 0, GL_RGB, self.width, self.height, 
-                     0, GL_RGB, GL_UNSIGNED_BYTE, frame_rgb)
+        glTexSubImage2D(GL_TEXTURE_2D, 0, 0, 0, self.width, self.height,
+                        GL_BGR, GL_UNSIGNED_BYTE, ctypes.c_void_p(0))
+        glBindBuffer(GL_PIXEL_UNPACK_BUFFER, 0)
+        self._pbo_pending = False
     
-    def is_quad_valid(self, r, c):
+    def _write_frame(self, frame, out):
         """
-        Check if a quad (mesh cell) should be drawn.
-        A quad is valid if all four corner nodes are valid.
+        Write a frame into out (a mapped pixel buffer), warping it first on
+        the CPU warp path. Results go straight into out, with no intermediate
+        copy; out is never read back, as mapped memory is slow to read.
         """
-        idx_tl = r * self.cols + c          # top-left
-        idx_tr = r * self.cols + (c + 1)    # top-right
-        idx_bl = (r + 1) * self.cols + c    # bottom-left
-        idx_br = (r + 1) * self.cols + (c + 1)  # bottom-right
-        
-        # Check bounds
-        if (idx_tl >= len(self.mesh) or idx_tr >= len(self.mesh) or
-            idx_bl >= len(self.mesh) or idx_br >= len(self.mesh)):
-            return False
+        if self.use_cpu_warp and self._use_umat:
+            # Same warp on the OpenCL device, downloaded once for the upload
+            warped = self._warp_umat
+            cv2.remap(cv2.UMat(frame), self._mapx, self._mapy, cv2.INTER_LINEAR,
+                      dst=warped, borderMode=cv2.BORDER_CONSTANT)
+            if self._intensity_map is not None:
+                cv2.multiply(warped, self._intensity_map, dst=warped, dtype=cv2.CV_8U)
+            np.copyto(out, warped.get())
+        elif self.use_cpu_warp and self._intensity_map is None:
+            cv2.remap(frame, self._mapx, self._mapy, cv2.INTER_LINEAR,
+                      dst=out, borderMode=cv2.BORDER_CONSTANT)
+        elif self.use_cpu_warp:
+            cv2.remap(frame, self._mapx, self._mapy, cv2.INTER_LINEAR,
+                      dst=self._warp_buf, borderMode=cv2.BORDER_CONSTANT)
+            cv2.multiply(self._warp_buf, self._intensity_map, dst=out, dtype=cv2.CV_8U)
+        else:
+            # Handles non-contiguous frames too, without a temporary copy
+            np.copyto(out, frame)
+    
+    def build_indices(self):
+        """Build the triangle index list, two triangles per valid mesh cell"""
+        r, c = np.nonzero(self.quad_valid)
+        idx_tl = r * self.cols + c    # top-left
+        idx_tr = idx_tl + 1           # top-right
+        idx_bl = idx_tl + self.cols   # bottom-left
+        idx_br = idx_bl + 1           # bottom-right
         
-        # Check if all four corners are valid
-        return (self.mesh[idx_tl]['valid'] and 
-                self.mesh[idx_tr]['valid'] and
-                self.mesh[idx_bl]['valid'] and
-                self.mesh[idx_br]['valid'])
+        triangles = np.stack([idx_tl, idx_bl, idx_tr, idx_tr, idx_bl, idx_br], axis=1)
+        return triangles.astype(np.uint32).ravel()
+    
+    def build_strip_indices(self):
+        """
+        Build the triangle strip indices: one strip per run of valid cells in
+        a mesh row, each ended by PRIMITIVE_RESTART_INDEX
+        """
+        strips = []
+        for r in range(self.rows - 1):
+            # Start and end (one past the last) columns of each run of valid cells
+            edges = np.diff(np.concatenate(([0], self.quad_valid[r].astype(np.int8), [0])))
+            starts = np.flatnonzero(edges == 1)
+            ends = np.flatnonzero(edges == -1)
+            for c0, c1 in zip(starts, ends):
+                # Alternate top and bottom nodes: tl, bl, tr, br, ...
+                top = r * self.cols + np.arange(c0, c1 + 1)
+                strip = np.empty(2 * len(top) + 1, dtype=np.uint32)
+                strip[0:-1:2] = top
+                strip[1:-1:2] = top + self.cols
+                strip[-1] = PRIMITIVE_RESTART_INDEX
+                strips.append(strip)
+        
+        if not strips:
+            return np.empty(0, dtype=np.uint32)
+        return np.concatenate(strips)
     
     def draw_mesh(self):
         """
-        Draw the warped mesh using triangle strips.
+        Draw the warped mesh from the vertex and index buffers.
         
         The mesh maps:
         - (u, v) input texture coordinates → (x, y) output screen coordinates
         - x, y define WHERE on screen each pixel appears
         - u, v define WHICH pixel from the input video to use
         """
-        glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
-        glLoadIdentity()
+        # The video texture is the only one and stays bound from init_gl
+        glClear(GL_COLOR_BUFFER_BIT)
         
-        glBindTexture(GL_TEXTURE_2D, self.texture_id)
-        
-        # Draw mesh as triangle strips, row by row
-        for r in range(self.rows - 1):
-            glBegin(GL_TRIANGLE_STRIP)
-            strip_started = False
-            
-            for c in range(self.cols):
-                # Check if this quad should be drawn
-                if c < self.cols - 1 and not self.is_quad_valid(r, c):
-                    # End current strip if one is active
-                    if strip_started:
-                        glEnd()
-                        glBegin(GL_TRIANGLE_STRIP)
-                        strip_started = False
-                    continue
-                
-                # Bottom vertex (current row)
-                idx1 = r * self.cols + c
-                if idx1 < len(self.mesh):
-                    m1 = self.mesh[idx1]
-                    if m1['valid']:
-                        # Apply intensity to color (multiplicative factor for r,g,b)
-                        glColor3f(m1['i'], m1['i'], m1['i'])
-                        glTexCoord2f(m1['u'], m1['v'])
-                        glVertex2f(m1['x'], m1['y'])
-                        strip_started = True
-                
-                # Top vertex (next row)
-                idx2 = (r + 1) * self.cols + c
-                if idx2 < len(self.mesh):
-                    m2 = self.mesh[idx2]
-                    if m2['valid']:
-                        glColor3f(m2['i'], m2['i'], m2['i'])
-                        glTexCoord2f(m2['u'], m2['v'])
-                        glVertex2f(m2['x'], m2['y'])
-            
-            glEnd()
+        # Draw the whole mesh (or, on the CPU warp path, the video quad) in a single call
+        if self.vao is not None:
+            glBindVertexArray(self.vao)
+        else:
+            glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, self.ebo)
+        glDrawElements(self.draw_mode, self.index_count, GL_UNSIGNED_INT, None)
     
     def apply_barrel_distortion(self, strength=0.3):
         """Apply barrel distortion effect to mesh (preserves validity)"""
-        for i, node in enumerate(self.mesh):
-            if not node['valid']:
-                continue
-                
-            # Get normalized coordinates (-1 to 1)
-            u_norm = node['u'] * 2.0 - 1.0
-            v_norm = node['v'] * 2.0 - 1.0
-            
-            # Calculate distance from center
-            r = np.sqrt(u_norm**2 + v_norm**2)
-            
-            # Apply barrel distortion formula
-            factor = 1.0 + strength * r**2
-            
-            # Update mesh positions
-            self.mesh[i]['x'] = u_norm * factor
-            self.mesh[i]['y'] = v_norm * factor
+        # With shaders the nodes are moved on the GPU; only the fixed-function
+        # fallback and the CPU warp still recompute the positions here
+        if self.program is not None:
+            self.set_warp_strength(strength)
+            return
+        
+        if HAVE_NUMBA:
+            _barrel_kernel(self.uv_norm, self.valid, self.pos, strength)
+            self.update_mesh_positions()
+            return
+        
+        u_norm = self.uv_norm[:, 0]
+        v_norm = self.uv_norm[:, 1]
+        
+        # Apply barrel distortion formula (r^2 straight from u, v, no sqrt needed)
+        factor = 1.0 + strength * (u_norm * u_norm + v_norm * v_norm)
+        
+        # Update mesh positions of the valid nodes, in place
+        np.copyto(self.pos, self.uv_norm * factor[:, None], where=self.valid[:, None])
+        
+        self.update_mesh_positions()
     
     def apply_pincushion_distortion(self, strength=0.3):
         """Apply pincushion distortion effect to mesh"""
@@ -361,11 +1103,13 @@ class MeshWarper:
     def reset_mesh(self):
         """Reset to original mesh"""
         if self.mesh_file:
-            self.mesh = self.load_mesh(self.mesh_file)
+            self.load_mesh(self.mesh_file)
             print("Reloaded mesh from file")
         else:
-            self.mesh = self.create_identity_mesh()
+            self.create_identity_mesh()
             print("Reset to identity mesh")
+        self.set_warp_strength(0.0)
+        self.upload_mesh()
     
     def run(self):
         """Main loop"""
@@ -392,6 +1136,13 @@ class MeshWarper:
         
         paused = False
         
+        # Decode on a background thread. Live sources deliver frames at their
+        # own rate (always showing the newest one); files are paced at their fps
+        live = isinstance(self.video_path, int)
+        self.stream = VideoStream(self.cap, drop_frames=live,
+                                  fps=None if live else self.fps)
+        self.stream.start()
+        
         while running:
             for event in pygame.event.get():
                 if event.type == QUIT:
@@ -412,45 +1163,73 @@ class MeshWarper:
                         self.reset_mesh()
                     elif event.key == K_SPACE:
                         paused = not paused
+                        if paused:
+                            self.stream.pause()
+                            # Show the frame that was last received
+                            self.flush_texture()
+                        else:
+                            self.stream.resume()
                         print("Paused" if paused else "Resumed")
                 elif event.type == VIDEORESIZE:
                     self.handle_resize(event.w, event.h)
             
+            # Take the next decoded frame if one is ready; otherwise keep
+            # showing the current one (the decoder sets the video's pace)
             if not paused:
-                # Read frame
-                ret, frame = self.cap.read()
-                if not ret:
-                    # Loop video
-                    self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
-                    ret, frame = self.cap.read()
-                    if not ret:
+                frame = self.stream.read(timeout=0)
+                if frame is not None:
+                    # Update texture
+                    self.update_texture(frame)
+                else:
+                    # No new frame yet: let the pending one reach the texture
+                    self.flush_texture()
+                    if not self.stream.running:
                         break
-                
-                # Update texture
-                self.update_texture(frame)
             
             # Draw mesh
             self.draw_mesh()
             
-            # Swap buffers
+            # Swap buffers (waits for the display refresh when vsync is on)
             pygame.display.flip()
             
-            # Control frame rate
-            clock.tick(self.fps)
+            # Without vsync, limit the loop to the video frame rate instead
+            # (the decoder still paces the video itself)
+            if not self.vsync:
+                clock.tick(self.fps)
         
         self.cleanup()
     
     def cleanup(self):
         """Clean up resources"""
+        if self.stream is not None:
+            self.stream.stop()
         self.cap.release()
         pygame.quit()
 
 
+def run_warper_process(video_source, mesh_file, rows, cols, use_cpu_warp):
+    """Warper process entry point: build a MeshWarper and run it"""
+    try:
+        warper = MeshWarper(
+            video_source, 
+            mesh_file, 
+            rows=rows, 
+            cols=cols,
+            use_cpu_warp=use_cpu_warp
+        )
+        warper.run()
+    except Exception as e:
+        print(f"Error in warper: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+
+
 class WarpingGUI:
     def __init__(self):
         self.root = tk.Tk()
         self.root.title("Video Mesh Warping - Configuration")
-        self.root.geometry("650x350")
+        self.root.geometry("650x380")
         self.root.resizable(False, False)
         
         # Variables
@@ -459,9 +1238,9 @@ class WarpingGUI:
         self.rows = tk.IntVar(value=20)
         self.cols = tk.IntVar(value=20)
         self.use_webcam = tk.BooleanVar(value=False)
+        self.use_cpu_warp = tk.BooleanVar(value=False)
         
-        self.warper = None
-        self.warper_thread = None
+        self.warper_process = None
         
         self.create_widgets()
         
@@ -498,10 +1277,15 @@ class WarpingGUI:
                                        command=self.toggle_webcam)
         webcam_check.grid(row=3, column=1, sticky=tk.W, pady=5)
         
+        # CPU warp checkbox
+        cpu_warp_check = ttk.Checkbutton(main_frame, text="Warp on CPU (no shaders)", 
+                                         variable=self.use_cpu_warp)
+        cpu_warp_check.grid(row=4, column=1, sticky=tk.W, pady=5)
+        
         # Mesh dimensions (only used if no file)
         dims_frame = ttk.LabelFrame(main_frame, text="Mesh Dimensions (only if no .map file)", 
                                     padding="10")
-        dims_frame.grid(row=4, column=0, columnspan=3, pady=15, sticky=(tk.W, tk.E))
+        dims_frame.grid(row=5, column=0, columnspan=3, pady=15, sticky=(tk.W, tk.E))
         
         ttk.Label(dims_frame, text="Columns (nx):").grid(row=0, column=0, padx=5)
         ttk.Spinbox(dims_frame, from_=5, to=100, textvariable=self.cols, 
@@ -514,11 +1298,11 @@ class WarpingGUI:
         # Start button
         start_btn = ttk.Button(main_frame, text="Start Warping", 
                               command=self.start_warping)
-        start_btn.grid(row=5, column=0, columnspan=3, pady=20, ipadx=20, ipady=5)
+        start_btn.grid(row=6, column=0, columnspan=3, pady=20, ipadx=20, ipady=5)
         
         # Instructions
         info_frame = ttk.LabelFrame(main_frame, text="Instructions", padding="10")
-        info_frame.grid(row=6, column=0, columnspan=3, pady=10, sticky=(tk.W, tk.E))
+        info_frame.grid(row=7, column=0, columnspan=3, pady=10, sticky=(tk.W, tk.E))
         
         instructions = (
             "1. Select a mesh map file (.map) or leave empty for identity mesh\n"
@@ -579,27 +1363,30 @@ class WarpingGUI:
             messagebox.showerror("Error", f"Mesh file not found: {mesh_file}")
             return
         
-        # Start warping in separate thread
-        def run_warper():
-            try:
-                self.warper = MeshWarper(
-                    video_source, 
-                    mesh_file, 
-                    rows=self.rows.get(), 
-                    cols=self.cols.get()
-                )
-                self.warper.run()
-            except Exception as e:
-                print(f"Error in warper: {e}")
-                import traceback
-                traceback.print_exc()
-                messagebox.showerror("Error", f"Failed to start warping: {str(e)}")
-        
-        self.warper_thread = threading.Thread(target=run_warper, daemon=True)
-        self.warper_thread.start()
+        # Start warping in a separate process, so pygame/OpenGL get a main
+        # thread of their own and don't share the GIL with Tk. The process is
+        # spawned rather than forked, so it doesn't inherit Tk's X11 state
+        self.warper_process = multiprocessing.get_context('spawn').Process(
+            target=run_warper_process,
+            args=(video_source, mesh_file, self.rows.get(), self.cols.get(),
+                  self.use_cpu_warp.get()),
+            daemon=True
+        )
+        self.warper_process.start()
         
         # Minimize the GUI window
         self.root.iconify()
+        self.root.after(500, self.check_warper)
+    
+    def check_warper(self):
+        """Poll the warper process and report if it failed"""
+        if self.warper_process.is_alive():
+            self.root.after(500, self.check_warper)
+            return
+        
+        if self.warper_process.exitcode != 0:
+            self.root.deiconify()
+            messagebox.showerror("Error", "Failed to start warping (see console for details)")
     
     def run(self):
         """Run the GUI"""